@@ -31,8 +31,11 @@ for path in src_path.rglob("*.py"):
 # this is the Alembic Config object
 config = context.config
 
-# Interpret the config file for Python logging
-if config.config_file_name is not None:
+# Interpret the config file for Python logging, unless the caller (e.g. the
+# API running migrations in-process) already configured logging
+if config.config_file_name is not None and config.attributes.get(
+    "configure_logger", True
+):
     fileConfig(config.config_file_name)
 
 # Set sqlalchemy.url
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+from sqlalchemy.exc import (
+    DataError,
+    DBAPIError,
+    IntegrityError,
+    InterfaceError,
+    OperationalError,
+)
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from api.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_connectivity_error(exc: BaseException) -> bool:
+    """
+    Indica se a exceção representa indisponibilidade do banco de dados.
+
+    Erros causados pela requisição (ex.: IntegrityError, DataError) não contam:
+    o banco respondeu. Com asyncpg, falhas de conexão chegam como OSError
+    (ConnectionRefusedError, socket.gaierror) sem o wrapper do SQLAlchemy.
+    """
+    if isinstance(exc, (IntegrityError, DataError)):
+        return False
+    if isinstance(
+        exc,
+        (
+            OperationalError,
+            InterfaceError,
+            PoolTimeoutError,
+            OSError,
+            asyncio.TimeoutError,
+        ),
+    ):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para operações que dependem do banco de dados.
+
+    - closed: requisições passam normalmente; falhas consecutivas são contadas.
+    - open: após `fail_threshold` falhas, as requisições falham imediatamente
+      até que `reset_timeout` segundos se passem.
+    - half_open: uma única requisição passa como sondagem enquanto as demais
+      continuam falhando; a falha da sondagem reabre o circuito e o sucesso o
+      fecha. Se a sondagem não tiver resultado em `reset_timeout` segundos,
+      outra é liberada.
+    """
+
+    def __init__(
+        self,
+        fail_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.fail_threshold = fail_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        # Conexões obtidas com sucesso do pool; só elas comprovam recuperação
+        self.connections = 0
+        self._lock = asyncio.Lock()
+
+    def record_connection(self) -> None:
+        """Registra uma conexão obtida do pool (evento "checkout" da engine)."""
+        self.connections += 1
+
+    async def is_open(self) -> bool:
+        """Indica se a requisição deve falhar imediatamente."""
+        if self.state == CLOSED:
+            return False
+        async with self._lock:
+            if self.state == CLOSED:
+                return False
+            # Libera uma única sondagem por `reset_timeout`; as demais requisições
+            # continuam falhando rápido enquanto a sondagem não termina
+            if self.clock() - self.opened_at < self.reset_timeout:
+                return True
+            self.state = HALF_OPEN
+            self.opened_at = self.clock()
+            logger.info("Circuit breaker half-open, probing database")
+            return False
+
+    async def record_failure(self) -> None:
+        """Registra uma falha de banco de dados."""
+        async with self._lock:
+            self.failure_count += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.failure_count >= self.fail_threshold
+            ):
+                self.state = OPEN
+                self.opened_at = self.clock()
+                logger.warning(
+                    "Circuit breaker opened after %d failures",
+                    self.failure_count,
+                    extra={"event": "breaker_open"},
+                )
+
+    async def record_success(self) -> None:
+        """Registra um sucesso e fecha o circuito, se necessário."""
+        if self.state == CLOSED and self.failure_count == 0:
+            return
+        async with self._lock:
+            if self.state != CLOSED:
+                logger.info("Circuit breaker closed", extra={"event": "breaker_closed"})
+            self.state = CLOSED
+            self.failure_count = 0
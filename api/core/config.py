@@ -7,6 +7,7 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Template Railway FastAPI"
     DATABASE_URL: str
     DEBUG: bool = False
+    LOG_JSON: bool = False  # Emite logs estruturados em JSON (uma linha por registro)
 
     # JWT Settings
     JWT_SECRET: str  # Change in production
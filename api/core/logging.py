@@ -1,8 +1,34 @@
+import functools
 import logging
 import sys
 
+import orjson
+
 from api.core.config import settings
 
+# Atributos padrão de LogRecord; o que sobrar veio do parâmetro `extra`
+_RESERVED_ATTRS = frozenset(
+    [*vars(logging.LogRecord("", 0, "", 0, "", None, None)), "message", "asctime"]
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """Format log records as single-line JSON, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(payload, default=str).decode("utf-8")
+
 
 def setup_logging() -> None:
     """Set up logging configuration."""
@@ -13,8 +39,12 @@ def setup_logging() -> None:
         datefmt="%H:%M:%S",
         stream=sys.stdout,
     )
+    if settings.LOG_JSON:
+        for handler in logging.getLogger().handlers:
+            handler.setFormatter(JSONFormatter(datefmt="%Y-%m-%dT%H:%M:%S"))
 
 
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
-    """Get a logger instance."""
+    """Get a logger instance (memoized per name)."""
     return logging.getLogger(name)
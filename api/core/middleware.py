@@ -1,76 +1,209 @@
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import status
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
-import traceback
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from api.core.breaker import CLOSED, CircuitBreaker, is_connectivity_error
 from api.core.logging import get_logger
+from api.core.path_trie import SafePathTrie
 
 logger = get_logger(__name__)
 
 
-async def db_exception_handler(request: Request, call_next):
+def _build_safe_paths() -> SafePathTrie:
+    trie = SafePathTrie()
+    for path in (
+        "/",
+        "/health",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+        "/auth/register",
+        "/auth/login",
+        "/auth/me",
+    ):
+        trie.insert(path, "exact")
+    trie.insert("/static", "prefix")
+    return trie
+
+
+class _StaticJSONResponse:
+    """Resposta JSON estática (status, cabeçalhos e corpo) serializada uma única vez."""
+
+    __slots__ = ("status_code", "headers", "body")
+
+    def __init__(self, status_code: int, content: dict) -> None:
+        self.status_code = status_code
+        self.body = orjson.dumps(content)
+        self.headers = (
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self.body)).encode("latin-1")),
+        )
+
+
+def _response_messages(response: _StaticJSONResponse) -> tuple[Message, Message]:
+    """Monta as mensagens ASGI de uma resposta pré-serializada.
+
+    As mensagens são novas a cada chamada porque middlewares externos
+    (ex.: CORS) alteram a lista de cabeçalhos in-place.
+    """
+    return (
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [*response.headers],
+        },
+        {"type": "http.response.body", "body": response.body},
+    )
+
+
+# Rotas que devem continuar funcionando mesmo com erro no banco de dados,
+# incluindo as rotas de autenticação e os arquivos estáticos
+_SAFE_PATHS = _build_safe_paths()
+
+# Respostas de erro são estáticas: serializadas uma única vez na importação
+_DB_503_RESPONSE = _StaticJSONResponse(
+    status.HTTP_503_SERVICE_UNAVAILABLE,
+    {
+        "detail": "Database service unavailable",
+        "message": "O serviço de banco de dados está temporariamente indisponível. Tente novamente mais tarde.",
+        "type": "database_error",
+    },
+)
+_500_RESPONSE = _StaticJSONResponse(
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+    {
+        "detail": "Internal server error",
+        "message": "Ocorreu um erro interno no servidor. Nossa equipe foi notificada.",
+    },
+)
+
+
+class DBExceptionMiddleware:
     """
-    Middleware para capturar exceções de banco de dados e retornar
+    Middleware ASGI para capturar exceções de banco de dados e retornar
     respostas apropriadas.
-    
+
     Permite que a API continue funcionando mesmo quando ocorrem erros
-    de conexão com o banco de dados.
+    de conexão com o banco de dados. Implementado como ASGI puro para
+    evitar o custo do BaseHTTPMiddleware (task extra e streams por request).
+
+    Um circuit breaker acompanha as falhas de conexão com o banco: enquanto
+    estiver aberto, as rotas que dependem do banco recebem 503 imediatamente,
+    sem abrir sessão. Com `engine`, cada conexão obtida do pool é registrada
+    no breaker, e só requisições que alcançaram o banco fecham o circuito.
     """
-    
-    # Todas as rotas devem funcionar igualmente, sem verificação prévia de disponibilidade
-    # Apenas as rotas críticas recebem tratamento especial quando ocorre um erro
-    safe_paths = ["/", "/health", "/docs", "/redoc", "/openapi.json"]
-    # Adiciona rotas de autenticação à lista de rotas seguras
-    auth_paths = ["/auth/register", "/auth/login", "/auth/me"]
-    is_static = request.url.path.startswith("/static/")
-    is_safe_path = request.url.path in safe_paths or request.url.path in auth_paths or is_static
-    
-    # Para todas as rotas, tentamos executar normalmente e só capturamos erros quando ocorrem
-    try:
-        
-        # Executa a rota normalmente se tudo estiver ok ou é uma rota crítica
-        return await call_next(request)
-    
-    except SQLAlchemyError as e:
-        # Log completo do erro para depuração
-        logger.error(f"Database error: {str(e)}")
-        logger.debug(f"Traceback: {traceback.format_exc()}")
-        
-        # Verifica se é rota de saúde ou raiz - essas devem continuar funcionando
-        if is_safe_path:
-            logger.warning(f"Critical route affected by DB error: {request.url.path}")
-            # Para essas rotas, tentar retornar uma resposta parcial
-            if request.url.path == "/health":
-                return JSONResponse(
-                    status_code=status.HTTP_200_OK,
-                    content={
-                        "api_status": "ok",
-                        "database_status": "error",
-                        "error": "Database connection failed",
-                        "version": "1.0.0"
-                    }
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        breaker: CircuitBreaker | None = None,
+        engine: AsyncEngine | None = None,
+    ) -> None:
+        self.app = app
+        self.breaker = breaker or CircuitBreaker()
+        if engine is not None:
+            event.listen(engine.sync_engine, "checkout", self._on_checkout)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.breaker.record_connection()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # /health trata as próprias falhas de banco e sempre responde 200,
+        # então os probes não precisam passar pelo tratamento de erros
+        if scope["type"] != "http" or scope["path"] == "/health":
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        breaker = self.breaker
+
+        # Com o circuito aberto, rotas dependentes do banco falham imediatamente
+        if (
+            breaker.state != CLOSED
+            and _SAFE_PATHS.classify(path) is None
+            and await breaker.is_open()
+        ):
+            logger.debug(
+                "Circuit open, rejecting request: %s",
+                path,
+                extra={"event": "breaker_reject", "path": path},
+            )
+            start, body = _response_messages(_DB_503_RESPONSE)
+            await send(start)
+            return await send(body)
+
+        response_started = False
+        connections = breaker.connections
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        # Todas as rotas devem funcionar igualmente, sem verificação prévia de disponibilidade
+        # Apenas as rotas críticas recebem tratamento especial quando ocorre um erro
+        # Para todas as rotas, tentamos executar normalmente e só capturamos erros quando ocorrem
+        try:
+            # Executa a rota normalmente
+            await self.app(scope, receive, send_wrapper)
+
+        except Exception as e:
+            # Só falhas de conexão contam para o circuit breaker; erros causados
+            # pela requisição (ex.: IntegrityError) não indicam banco indisponível
+            db_unavailable = is_connectivity_error(e)
+            if db_unavailable:
+                await breaker.record_failure()
+
+            # Se a resposta já começou a ser enviada, não há como substituí-la
+            if response_started:
+                raise
+
+            if db_unavailable or isinstance(e, SQLAlchemyError):
+                # Log completo do erro para depuração
+                logger.error(
+                    "Database error: %s",
+                    e,
+                    extra={"event": "db_error", "path": path},
                 )
-            # Outras rotas críticas continuam normalmente
-            return await call_next(request)
-        
-        # Para demais rotas com dados do banco, retornar erro informativo
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={
-                "detail": "Database service unavailable",
-                "message": "O serviço de banco de dados está temporariamente indisponível. Tente novamente mais tarde.",
-                "type": "database_error"
-            }
-        )
-    except Exception as e:
-        # Captura outras exceções não relacionadas ao banco
-        logger.error(f"Unhandled error: {str(e)}")
-        logger.debug(f"Traceback: {traceback.format_exc()}")
-        
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "detail": "Internal server error",
-                "message": "Ocorreu um erro interno no servidor. Nossa equipe foi notificada."
-            }
-        )
+                logger.debug(
+                    "Database error traceback",
+                    exc_info=True,
+                    extra={"event": "db_error", "path": path},
+                )
+
+                # Rotas críticas não são reexecutadas: o corpo da requisição já foi
+                # consumido e uma nova leitura de `receive` ficaria bloqueada
+                if _SAFE_PATHS.classify(path) is not None:
+                    logger.warning(
+                        "Critical route affected by DB error: %s",
+                        path,
+                        extra={"event": "db_error_safe_route", "path": path},
+                    )
+
+                # Retorna erro informativo para qualquer rota com falha de banco
+                start, body = _response_messages(_DB_503_RESPONSE)
+            else:
+                # Captura outras exceções não relacionadas ao banco
+                logger.error(
+                    "Unhandled error: %s",
+                    e,
+                    extra={"event": "unhandled_error", "path": path},
+                )
+                logger.debug(
+                    "Unhandled error traceback",
+                    exc_info=True,
+                    extra={"event": "unhandled_error", "path": path},
+                )
+
+                start, body = _response_messages(_500_RESPONSE)
+
+            await send(start)
+            await send(body)
+        else:
+            # Só requisições que obtiveram conexão do banco comprovam recuperação;
+            # 404, 401 ou 422 sem acesso ao banco não fecham o circuito
+            if breaker.failure_count and breaker.connections != connections:
+                await breaker.record_success()
@@ -0,0 +1,46 @@
+from typing import Literal
+
+PathKind = Literal["exact", "prefix"]
+
+
+class _Node:
+    __slots__ = ("children", "terminal_kind")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.terminal_kind: PathKind | None = None
+
+
+class SafePathTrie:
+    """
+    Trie indexada por segmentos de caminho para classificar rotas seguras.
+
+    Regras "exact" casam apenas o caminho exato; regras "prefix" casam qualquer
+    caminho abaixo do prefixo (ex.: "/static" casa "/static/app.js", mas não
+    "/static"). A classificação percorre o caminho uma única vez, com custo
+    proporcional à profundidade e não ao número de regras.
+    """
+
+    def __init__(self) -> None:
+        self._root = _Node()
+
+    def insert(self, pattern: str, kind: PathKind) -> None:
+        """Registra uma regra de caminho do tipo "exact" ou "prefix"."""
+        if kind not in ("exact", "prefix"):
+            raise ValueError(f"Invalid path kind: {kind}")
+
+        node = self._root
+        for segment in pattern.split("/")[1:]:
+            node = node.children.setdefault(segment, _Node())
+        node.terminal_kind = kind
+
+    def classify(self, path: str) -> PathKind | None:
+        """Retorna o tipo da regra que casa com o caminho, ou None."""
+        node = self._root
+        for segment in path.split("/")[1:]:
+            if node.terminal_kind == "prefix":
+                return "prefix"
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return "exact" if node.terminal_kind == "exact" else None
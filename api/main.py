@@ -1,13 +1,17 @@
-from fastapi import FastAPI, Depends
+import asyncio
+from contextlib import asynccontextmanager
+
+import orjson
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import text
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import text
 
 from api.core.config import settings
+from api.core.database import get_engine
 from api.core.logging import get_logger, setup_logging
-from api.core.database import get_session
-from api.core.middleware import db_exception_handler
+from api.core.middleware import DBExceptionMiddleware
 from api.src.heroes.routes import router as heroes_router
 from api.src.users.routes import router as auth_router
 from api.utils.migrations import run_migrations
@@ -18,17 +22,54 @@ setup_logging()
 # Set up logger for this module
 logger = get_logger(__name__)
 
-# Optional: Run migrations on startup - não impede a inicialização se falhar
-migrations_success = run_migrations()
-if not migrations_success:
-    logger.warning("Database migrations failed but API will continue to function with limited capabilities")
+# Consulta do health check criada uma única vez para reaproveitar o cache de compilação
+_HEALTH_STMT = text("SELECT 1")
+
+
+def _health_body(database_status: str) -> bytes:
+    return orjson.dumps(
+        {"api_status": "ok", "database_status": database_status, "version": "1.0.0"}
+    )
+
+
+# Respostas estáticas serializadas uma única vez na importação
+_HEALTH_OK_BODY = _health_body("connected")
+_HEALTH_DISCONNECTED_BODY = _health_body("disconnected")
+_HEALTH_ERROR_BODY = _health_body("error")
+_ROOT_BODY = orjson.dumps(
+    {
+        "message": "Bem-vindo à API do template-railway-fastapi!",
+        "docs": "/docs",
+        "health": "/health",
+        "version": "1.0.0",
+    }
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Executa as migrações após o event loop iniciar, sem bloquear a importação."""
+    # Optional: Run migrations on startup - não impede a inicialização se falhar
+    migrations_success = await asyncio.to_thread(run_migrations)
+    if not migrations_success:
+        logger.warning(
+            "Database migrations failed but API will continue to function with limited capabilities"
+        )
+    yield
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     debug=settings.DEBUG,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Adiciona middleware para CORS
+# Adiciona middleware personalizado para tratamento de erros de banco de dados
+app.add_middleware(DBExceptionMiddleware, engine=get_engine())
+
+# Adiciona middleware para CORS por último, para ser o mais externo e também
+# incluir os cabeçalhos de CORS nas respostas de erro do middleware acima
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Em ambiente de produção, especifique os domínios permitidos
@@ -37,52 +78,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Adiciona middleware personalizado para tratamento de erros de banco de dados
-@app.middleware("http")
-async def db_errors_middleware(request, call_next):
-    return await db_exception_handler(request, call_next)
-
 # Include routers
 app.include_router(auth_router)
 app.include_router(heroes_router)
 
 
 @app.get("/health")
-async def health_check(session: AsyncSession = Depends(get_session)):
+async def health_check():
     """Verificar se a API está funcionando e a conexão com o banco de dados está ativa.
-    
+
     A API continuará funcionando mesmo se o banco de dados estiver indisponível.
     """
-    db_status = "connected"
-    api_status = "ok"
-    
+    body = _HEALTH_OK_BODY
+
     try:
-        # Tenta executar uma consulta simples para verificar a conexão
-        await session.execute(text("SELECT 1"))
+        # Tenta executar uma consulta simples para verificar a conexão,
+        # direto na engine para evitar o custo de uma sessão ORM
+        async with get_engine().connect() as conn:
+            await conn.execute(_HEALTH_STMT)
     except SQLAlchemyError as e:
-        db_status = "disconnected"
-        logger.error(f"Database connection failed: {str(e)}")
+        body = _HEALTH_DISCONNECTED_BODY
+        logger.error("Database connection failed: %s", e)
     except Exception as e:
-        db_status = "error"
-        logger.error(f"Unexpected error checking database: {str(e)}")
-    
-    return {
-        "api_status": api_status,
-        "database_status": db_status,
-        "version": "1.0.0"
-    }
+        body = _HEALTH_ERROR_BODY
+        logger.error("Unexpected error checking database: %s", e)
+
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/")
 async def root():
     """Rota raiz da API, retorna uma mensagem de boas-vindas.
-    
+
     Esta rota sempre funcionará, independentemente da conexão com o banco de dados.
     """
     logger.debug("Root endpoint called")
-    return {
-        "message": "Bem-vindo à API do template-railway-fastapi!",
-        "docs": "/docs",
-        "health": "/health",
-        "version": "1.0.0"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
@@ -1,49 +1,84 @@
-import os
-import subprocess
-import sys
+import logging
+from contextlib import contextmanager
+from logging.handlers import MemoryHandler
+from pathlib import Path
+
 from api.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Raiz do projeto, onde ficam o alembic.ini e o diretório de migrações
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+@contextmanager
+def _buffered_logs(*loggers: logging.Logger):
+    """
+    Acumula os registros dos loggers informados e os escreve de uma vez ao final,
+    em vez de uma escrita no stream por registro.
+    """
+    root_handlers = logging.getLogger().handlers
+    if not root_handlers:
+        yield
+        return
+
+    buffer = MemoryHandler(
+        capacity=1024, flushLevel=logging.CRITICAL, target=root_handlers[0]
+    )
+    propagate = [log.propagate for log in loggers]
+    for log in loggers:
+        log.addHandler(buffer)
+        log.propagate = False
+    try:
+        yield
+    finally:
+        for log, previous in zip(loggers, propagate):
+            log.removeHandler(buffer)
+            log.propagate = previous
+        buffer.close()
+
 
 def run_migrations():
     """
-    Runs Alembic database migrations using sys.executable and module execution.
+    Runs Alembic database migrations in-process through Alembic's Python API.
+
+    Avoids spawning a new interpreter (and re-importing Alembic, SQLAlchemy and
+    all models) just to run `alembic upgrade head`. Log records emitted during
+    the migration are buffered and flushed once at the end.
+
+    Must not run on the event loop thread: the Alembic env.py calls
+    asyncio.run(), so call it from a worker thread (e.g. asyncio.to_thread).
 
-    This method is more compatible with environments like Vercel where direct
-    command execution might be restricted.
-    
     A falha nas migrações não irá impedir a inicialização da API, permitindo
     que a aplicação continue funcionando mesmo sem banco de dados.
     """
-    try:
-        # Ensure the current directory is in the Python path
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        sys.path.insert(0, current_dir)
-
-        # Use sys.executable to run the Alembic module
-        result = subprocess.run(
-            [sys.executable, "-m", "alembic", "upgrade", "head"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-
-        # Print the output if there's any
-        if result.stdout:
-            print("Migration output:", result.stdout)
-
-        print("Migrations completed successfully!")
-
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Migration failed. Error: {e}")
-        logger.error(f"Standard output: {e.stdout}")
-        logger.error(f"Standard error: {e.stderr}")
-        # Não propaga o erro para permitir que a aplicação continue
-        return False
-    except Exception as e:
-        logger.error(f"An error occurred while running migrations: {e}")
-        # Não propaga o erro para permitir que a aplicação continue
-        return False
-    
+    alembic_logger = get_logger("alembic")
+    # Sem o fileConfig do env.py, aplica aqui o nível definido no alembic.ini,
+    # restaurando o nível anterior ao final
+    previous_level = alembic_logger.level
+    alembic_logger.setLevel(logging.ERROR)
+
+    # Importado só agora para que o nível acima já valha para os logs de importação
+    from alembic import command
+    from alembic.config import Config
+
+    with _buffered_logs(logger, alembic_logger):
+        try:
+            cfg = Config(str(PROJECT_ROOT / "alembic.ini"))
+            cfg.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+            # Mantém a configuração de logging da aplicação
+            cfg.attributes["configure_logger"] = False
+
+            command.upgrade(cfg, "head")
+
+            logger.info("Migrations completed successfully!")
+
+        except Exception as e:
+            logger.error("An error occurred while running migrations: %s", e)
+            # Não propaga o erro para permitir que a aplicação continue
+            return False
+
+        finally:
+            alembic_logger.setLevel(previous_level)
+
     return True
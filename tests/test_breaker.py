@@ -0,0 +1,242 @@
+import asyncio
+import socket
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import (
+    DataError,
+    DBAPIError,
+    IntegrityError,
+    InterfaceError,
+    OperationalError,
+)
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from api.core.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    is_connectivity_error,
+)
+from api.core.middleware import DBExceptionMiddleware
+
+
+class FakeClock:
+    """Relógio controlado do breaker: `advance(s)` adianta o tempo."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def _db_error(cls, **kwargs):
+    return cls("SELECT 1", {}, Exception("db"), **kwargs)
+
+
+CONNECTIVITY_ERRORS = [
+    _db_error(OperationalError),
+    _db_error(InterfaceError),
+    PoolTimeoutError("QueuePool limit reached"),
+    _db_error(DBAPIError, connection_invalidated=True),
+    ConnectionRefusedError(111, "Connect call failed"),
+    socket.gaierror(-2, "Name or service not known"),
+    asyncio.TimeoutError(),
+]
+
+CLIENT_ERRORS = [
+    _db_error(IntegrityError),
+    _db_error(DataError),
+    _db_error(DBAPIError),
+]
+
+
+def create_client(
+    breaker: CircuitBreaker,
+    db_up: dict,
+    calls: list,
+    error: Exception | None = None,
+) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(DBExceptionMiddleware, breaker=breaker)
+    error = error or _db_error(OperationalError)
+
+    @app.get("/heroes/")
+    async def heroes():
+        calls.append("/heroes/")
+        if not db_up["value"]:
+            raise error
+        # Simula o evento "checkout" do pool registrado pela engine
+        breaker.record_connection()
+        return []
+
+    @app.get("/")
+    async def root():
+        calls.append("/")
+        return {"message": "ok"}
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("error", CONNECTIVITY_ERRORS, ids=repr)
+def test_connectivity_errors_count(error):
+    assert is_connectivity_error(error)
+
+
+@pytest.mark.parametrize("error", CLIENT_ERRORS, ids=repr)
+def test_client_errors_do_not_count(error):
+    assert not is_connectivity_error(error)
+
+
+@pytest.mark.parametrize("error", CONNECTIVITY_ERRORS, ids=repr)
+def test_connectivity_errors_open_circuit(error):
+    breaker = CircuitBreaker()
+    client = create_client(breaker, {"value": False}, [], error)
+
+    for _ in range(5):
+        response = client.get("/heroes/")
+        assert response.status_code == 503
+        assert response.json()["type"] == "database_error"
+
+    assert breaker.state == OPEN
+
+
+@pytest.mark.parametrize("error", CLIENT_ERRORS, ids=repr)
+def test_client_errors_do_not_open_circuit(error):
+    breaker = CircuitBreaker()
+    calls = []
+    client = create_client(breaker, {"value": False}, calls, error)
+
+    for _ in range(10):
+        client.get("/heroes/")
+
+    assert breaker.state == CLOSED
+    assert breaker.failure_count == 0
+    assert len(calls) == 10
+
+
+async def _fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        await breaker.record_failure()
+
+
+async def test_opens_after_threshold_failures():
+    breaker = CircuitBreaker()
+
+    await _fail(breaker, 4)
+    assert breaker.state == CLOSED
+    assert not await breaker.is_open()
+
+    await _fail(breaker, 1)
+    assert breaker.state == OPEN
+    assert await breaker.is_open()
+
+
+async def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(clock=clock)
+    await _fail(breaker, 5)
+
+    clock.advance(29)
+    assert await breaker.is_open()
+
+    clock.advance(2)
+    assert not await breaker.is_open()
+    assert breaker.state == HALF_OPEN
+    # Enquanto a sondagem não termina, as demais requisições falham rápido
+    assert await breaker.is_open()
+    assert await breaker.is_open()
+
+
+async def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(clock=clock)
+    await _fail(breaker, 5)
+    clock.advance(31)
+    assert not await breaker.is_open()
+
+    await breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert await breaker.is_open()
+
+
+async def test_successful_probe_closes(clock):
+    breaker = CircuitBreaker(clock=clock)
+    await _fail(breaker, 5)
+    clock.advance(31)
+    assert not await breaker.is_open()
+
+    await breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.failure_count == 0
+    assert not await breaker.is_open()
+
+
+def test_open_circuit_fails_fast_on_db_routes():
+    calls = []
+    db_up = {"value": False}
+    client = create_client(CircuitBreaker(), db_up, calls)
+
+    for _ in range(5):
+        assert client.get("/heroes/").status_code == 503
+    assert len(calls) == 5
+
+    response = client.get("/heroes/")
+    assert response.status_code == 503
+    assert response.json()["type"] == "database_error"
+    assert len(calls) == 5
+
+
+def test_open_circuit_lets_safe_routes_through():
+    calls = []
+    db_up = {"value": False}
+    client = create_client(CircuitBreaker(), db_up, calls)
+    for _ in range(5):
+        client.get("/heroes/")
+
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert calls[-1] == "/"
+
+
+def test_successful_probe_closes_circuit():
+    calls = []
+    db_up = {"value": False}
+    breaker = CircuitBreaker(reset_timeout=0)
+    client = create_client(breaker, db_up, calls)
+    for _ in range(5):
+        client.get("/heroes/")
+    assert breaker.state == OPEN
+
+    db_up["value"] = True
+    assert client.get("/heroes/").status_code == 200
+
+    assert breaker.state == CLOSED
+    assert breaker.failure_count == 0
+
+
+def test_probe_without_db_access_does_not_close_circuit():
+    db_up = {"value": False}
+    breaker = CircuitBreaker(reset_timeout=0)
+    client = create_client(breaker, db_up, [])
+    for _ in range(5):
+        client.get("/heroes/")
+    assert breaker.state == OPEN
+
+    # Uma rota inexistente não alcança o banco e não comprova recuperação
+    assert client.get("/favicon.ico").status_code == 404
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.failure_count == 5
@@ -0,0 +1,31 @@
+import logging
+import sys
+
+import orjson
+
+from api.core.logging import JSONFormatter
+
+
+def _make_record(**extra) -> logging.LogRecord:
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        exc_info = sys.exc_info()
+    record = logging.LogRecord(
+        "api.test", logging.ERROR, __file__, 1, "Database error: %s", ("x",), exc_info
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields_and_exc_info():
+    record = _make_record(event="db_error", path="/heroes/")
+
+    payload = orjson.loads(JSONFormatter().format(record))
+
+    assert payload["level"] == "ERROR"
+    assert payload["logger"] == "api.test"
+    assert payload["message"] == "Database error: x"
+    assert payload["event"] == "db_error"
+    assert payload["path"] == "/heroes/"
+    assert "ValueError: boom" in payload["exc_info"]
@@ -9,3 +9,14 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_cors_vary_header_without_origin():
+    response = client.get("/")
+    assert response.status_code == 200
+    assert "Origin" in response.headers["vary"]
+
+
+def test_cors_headers_with_origin():
+    response = client.get("/", headers={"Origin": "http://example.com"})
+    assert response.headers["access-control-allow-origin"] == "http://example.com"
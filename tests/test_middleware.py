@@ -0,0 +1,50 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from api.core.middleware import DBExceptionMiddleware
+
+
+def _db_down():
+    return OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(DBExceptionMiddleware)
+
+    @app.post("/auth/login")
+    async def login(request: Request):
+        await request.body()
+        raise _db_down()
+
+    @app.get("/heroes/")
+    async def heroes():
+        raise _db_down()
+
+    @app.get("/boom")
+    async def boom():
+        raise ValueError("boom")
+
+    return app
+
+
+def test_db_error_returns_503():
+    client = TestClient(create_app())
+    response = client.get("/heroes/")
+    assert response.status_code == 503
+    assert response.json()["type"] == "database_error"
+
+
+def test_db_error_on_safe_route_post_returns_503():
+    client = TestClient(create_app())
+    response = client.post("/auth/login", data={"username": "a", "password": "b"})
+    assert response.status_code == 503
+    assert response.json()["type"] == "database_error"
+
+
+def test_unhandled_error_returns_500():
+    client = TestClient(create_app())
+    response = client.get("/boom")
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Internal server error"
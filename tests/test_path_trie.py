@@ -0,0 +1,37 @@
+import pytest
+
+from api.core.path_trie import SafePathTrie
+
+
+@pytest.fixture
+def trie() -> SafePathTrie:
+    trie = SafePathTrie()
+    for path in ("/", "/health", "/docs", "/auth/login"):
+        trie.insert(path, "exact")
+    trie.insert("/static", "prefix")
+    return trie
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/", "exact"),
+        ("", None),
+        ("/health", "exact"),
+        ("/health/", None),
+        ("/static", None),
+        ("/static/", "prefix"),
+        ("/static/a/b.js", "prefix"),
+        ("/auth", None),
+        ("/auth/login", "exact"),
+        ("/docs/x", None),
+        ("/heroes", None),
+    ],
+)
+def test_classify(trie: SafePathTrie, path: str, expected):
+    assert trie.classify(path) == expected
+
+
+def test_insert_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        SafePathTrie().insert("/x", "glob")